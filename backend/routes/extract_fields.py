@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional, Union
 
@@ -114,8 +115,13 @@ async def extract_fields(request: ExtractFieldsRequest) -> ExtractFieldsResponse
                 filename = f"extracted_{text_hash}"
             
             structured_path = get_output_path(filename, suffix="_structured", prefix="04")
-            # Save with line_numbers included for each field
-            save_json(structured_path, {"fields": {k: v.dict() for k, v in fields_dict.items()}})
+            # Save with line_numbers included for each field; the disk write
+            # runs on a worker thread so it never blocks the event loop
+            await asyncio.to_thread(
+                save_json,
+                structured_path,
+                {"fields": {k: v.dict() for k, v in fields_dict.items()}},
+            )
             logger.info("Saved structured fields to %s", structured_path)
         except Exception as e:
             logger.warning(f"Failed to save structured fields: {e}")
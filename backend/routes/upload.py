@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import List, Optional, Union
 
@@ -47,55 +48,21 @@ async def upload_files(files: List[UploadFile] = File(...)) -> List[UploadRespon
             detail="At least one file must be provided.",
         )
 
-    responses: List[UploadResponse] = []
-
-    for uploaded_file in files:
-        file_name = uploaded_file.filename or "unknown"
-        
-        try:
-            # Validate file extension
-            validate_file_extension(uploaded_file)
-            
-            logger.info(f"Processing file: {file_name}")
-            
-            # Process file through LLMWhisperer service
-            # This handles:
-            # - Reading file bytes
-            # - Calling LLMWhisperer with layout_preserving mode and line numbers
-            # - Polling until completion
-            # - Extracting result_text, whisper_hash, pages, and bounding_boxes
-            extraction_result = await process_upload_file(uploaded_file)
-            
-            # Format response using utility function
-            formatted = format_upload_response(extraction_result)
-            responses.append(UploadResponse(**formatted))
-            
-            logger.info(f"Successfully processed file: {file_name}")
-            
-        except HTTPException as exc:
-            # Re-raise HTTP exceptions (they already have proper status codes)
-            error_msg = f"Failed to process '{file_name}': {exc.detail}"
-            logger.error(error_msg)
-            raise HTTPException(
-                status_code=exc.status_code,
-                detail=error_msg,
-            ) from exc
-        except ValueError as exc:
-            # Validation errors
-            error_msg = f"Invalid data for '{file_name}': {str(exc)}"
-            logger.error(error_msg)
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=error_msg,
-            ) from exc
-        except Exception as exc:
-            # Unexpected errors
-            error_msg = f"Unexpected error processing '{file_name}': {str(exc)}"
-            logger.exception(error_msg)
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=error_msg,
-            ) from exc
+    # Files are processed concurrently; the LLMWhisperer service bounds
+    # in-flight uploads with its own semaphore. The TaskGroup cancels and
+    # drains the remaining pipelines on the first failure, so no work
+    # continues against UploadFile objects after the error response (and
+    # the whole request fails, as the sequential loop did).
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [
+                task_group.create_task(_process_one_file(uploaded_file))
+                for uploaded_file in files
+            ]
+    except* HTTPException as exc_group:
+        raise exc_group.exceptions[0]
+
+    responses: List[UploadResponse] = [task.result() for task in tasks]
 
     if not responses:
         raise HTTPException(
@@ -105,3 +72,54 @@ async def upload_files(files: List[UploadFile] = File(...)) -> List[UploadRespon
 
     logger.info(f"Successfully processed {len(responses)} file(s)")
     return responses
+
+
+async def _process_one_file(uploaded_file: UploadFile) -> UploadResponse:
+    """Validate, extract and format one upload, translating its errors."""
+    file_name = uploaded_file.filename or "unknown"
+
+    try:
+        # Validate file extension
+        validate_file_extension(uploaded_file)
+
+        logger.info(f"Processing file: {file_name}")
+
+        # Process file through LLMWhisperer service
+        # This handles:
+        # - Reading file bytes
+        # - Calling LLMWhisperer with layout_preserving mode and line numbers
+        # - Polling until completion
+        # - Extracting result_text, whisper_hash, pages, and bounding_boxes
+        extraction_result = await process_upload_file(uploaded_file)
+
+        # Format response using utility function
+        formatted = await format_upload_response(extraction_result)
+        response = UploadResponse(**formatted)
+
+        logger.info(f"Successfully processed file: {file_name}")
+        return response
+
+    except HTTPException as exc:
+        # Re-raise HTTP exceptions (they already have proper status codes)
+        error_msg = f"Failed to process '{file_name}': {exc.detail}"
+        logger.error(error_msg)
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=error_msg,
+        ) from exc
+    except ValueError as exc:
+        # Validation errors
+        error_msg = f"Invalid data for '{file_name}': {str(exc)}"
+        logger.error(error_msg)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=error_msg,
+        ) from exc
+    except Exception as exc:
+        # Unexpected errors
+        error_msg = f"Unexpected error processing '{file_name}': {str(exc)}"
+        logger.exception(error_msg)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=error_msg,
+        ) from exc
@@ -4,6 +4,7 @@ from typing import List
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 # Configure logging
@@ -17,8 +18,21 @@ load_dotenv()
 from routes.upload import router as upload_router
 from routes.extract_fields import router as extract_fields_router
 from routes.highlight import router as highlight_router
+from services.llmwhisperer_service import close_client
 
-app = FastAPI(title="DocExtract Backend", version="1.0.0")
+# orjson serializes the large text/bounding-box payloads this API returns
+# far faster than the stdlib encoder
+app = FastAPI(
+    title="DocExtract Backend",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+
+
+@app.on_event("shutdown")
+async def shutdown_http_client() -> None:
+    """Close the shared LLMWhisperer HTTP client and its pooled connections."""
+    await close_client()
 
 default_origins = "http://localhost:8080,http://127.0.0.1:8080"
 allowed_origins: List[str] = os.getenv("BACKEND_CORS_ORIGINS", default_origins).split(",")
@@ -24,12 +24,13 @@ class GroqService:
         self.api_base_url = GROQ_API_BASE_URL.rstrip("/")
         self.model = GROQ_MODEL
 
-    async def extract(self, prompt: str) -> str:
+    async def extract(self, prompt: str, model: str | None = None) -> str:
         """
         Send a prompt to Groq API and return the raw text response.
 
         Args:
             prompt: The prompt text to send to the LLM
+            model: Optional model override (defaults to the configured model)
 
         Returns:
             Raw text response from the LLM
@@ -43,7 +44,7 @@ class GroqService:
         }
 
         payload = {
-            "model": self.model,
+            "model": model or self.model,
             "temperature": 0,
             "response_format": {"type": "json_object"},
             "messages": [
@@ -73,9 +74,12 @@ class GroqService:
             except httpx.HTTPStatusError as exc:
                 error_msg = f"Groq API request failed: {exc.response.text}"
                 logger.error(error_msg)
+                # Propagate Retry-After so callers can pace their retries
+                retry_after = exc.response.headers.get("Retry-After")
                 raise HTTPException(
                     status_code=exc.response.status_code,
                     detail=error_msg,
+                    headers={"Retry-After": retry_after} if retry_after else None,
                 ) from exc
             except httpx.HTTPError as exc:
                 error_msg = f"Failed to reach Groq API: {exc}"
@@ -1,24 +1,72 @@
 import asyncio
+import hashlib
 import logging
 import os
+import random
+import re
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
 import httpx
+import orjson
 from fastapi import HTTPException, UploadFile, status
 from unstract.llmwhisperer import LLMWhispererClientV2
 
-from utils.file_saver import get_input_path, save_bytes
+from utils.file_saver import ensure_folders, get_input_path
 
 logger = logging.getLogger(__name__)
 
+# Strips the "0x1a2b: " hex line-number prefixes LLMWhisperer prepends
+# to layout-preserving lines; compiled once instead of per line
+_HEX_LINE_NO_RE = re.compile(r'0x[0-9A-Fa-f]+:\s*')
+
+__all__ = ("process_upload_file", "get_highlight_data", "get_client", "close_client")
+
 LLMWHISPERER_BASE_URL = os.getenv(
     "LLMWHISPERER_BASE_URL",
     "https://llmwhisperer-api.us-central.unstract.com/api/v2",
 )
 LLMWHISPERER_API_KEY = os.getenv("LLMWHISPERER_API_KEY")
-POLL_INTERVAL_SECONDS = float(os.getenv("LLMWHISPERER_POLL_INTERVAL", "2.0"))
-MAX_POLL_ATTEMPTS = int(os.getenv("LLMWHISPERER_MAX_POLLS", "90"))
+POLL_DEADLINE_SECONDS = float(os.getenv("LLMWHISPERER_POLL_DEADLINE", "300"))
+
+# Adaptive poll schedule: start fast so short documents finish quickly,
+# back off geometrically (with jitter) so long jobs don't over-poll
+_POLL_INITIAL_DELAY = 0.25
+_POLL_BACKOFF_FACTOR = 1.3
+_POLL_MAX_DELAY = 5.0
+
+# Terminal whisper-status values (compared lowercased)
+_STATUS_DONE = frozenset({"processed", "completed", "done"})
+_STATUS_FAILED = frozenset({"failed", "error"})
+
+# Chunk size for streaming upload bodies instead of buffering whole files
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Content-addressed cache of completed extractions: identical re-uploads
+# skip the whole whisper pipeline (often 30+ seconds) for a dict lookup
+_RESULT_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_RESULT_CACHE_MAX = int(os.getenv("LLMWHISPERER_CACHE_SIZE", "256"))
+_RESULT_CACHE_TTL = float(os.getenv("LLMWHISPERER_CACHE_TTL", "3600"))
+
+# Cap concurrent extraction pipelines; bursts beyond this queue on the
+# semaphore instead of overwhelming the API (and our connection pool)
+_MAX_CONCURRENT_UPLOADS = int(os.getenv("LLMWHISPERER_MAX_CONCURRENCY", "8"))
+_UPLOAD_SEMAPHORE = asyncio.Semaphore(_MAX_CONCURRENT_UPLOADS)
+
+# Request headers and whisper parameters never vary between calls, so they
+# are built once here instead of per upload/status/retrieve request
+_AUTH_HEADERS = {"unstract-key": LLMWHISPERER_API_KEY or ""}
+_UPLOAD_HEADERS = {
+    "unstract-key": LLMWHISPERER_API_KEY or "",
+    "Content-Type": "application/octet-stream",
+}
+_WHISPER_PARAMS = {
+    "mode": "form",
+    "output_mode": "layout_preserving",
+    "add_line_nos": "true",
+}
 
 # Initialize LLMWhisperer SDK V2 client
 llmw_client = LLMWhispererClientV2(
@@ -26,26 +74,81 @@ llmw_client = LLMWhispererClientV2(
     api_key=LLMWHISPERER_API_KEY
 )
 
+# Shared HTTP client so upload/status/retrieve calls reuse pooled keep-alive
+# connections instead of paying a TCP+TLS handshake per request
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it lazily on first use."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            base_url=LLMWHISPERER_BASE_URL.rstrip("/"),
+            # Fail fast on connect/pool acquisition; only reads (large
+            # retrieve payloads, slow extractions) get the long budget
+            timeout=httpx.Timeout(connect=5.0, read=180.0, write=60.0, pool=5.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the shared AsyncClient (called on application shutdown)."""
+    global _CLIENT
+    if _CLIENT is not None and not _CLIENT.is_closed:
+        await _CLIENT.aclose()
+    _CLIENT = None
+
 
 async def process_upload_file(upload_file: UploadFile) -> Dict[str, Any]:
     """Upload a file to LLMWhisperer v2 and poll until the extraction completes."""
+    async with _UPLOAD_SEMAPHORE:
+        return await _process_upload_file(upload_file)
+
+
+async def _process_upload_file(upload_file: UploadFile) -> Dict[str, Any]:
     if not LLMWHISPERER_API_KEY:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="LLMWHISPERER_API_KEY is not configured.",
         )
 
-    file_bytes = await upload_file.read()
-    await upload_file.seek(0)
-
-    if not file_bytes:
+    # Reject empty uploads before pulling the whole body into memory.
+    # Starlette exposes the multipart size when known; otherwise probe one byte.
+    if upload_file.size == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"'{upload_file.filename}' is empty.",
         )
+    if upload_file.size is None:
+        probe = await upload_file.read(1)
+        await upload_file.seek(0)
+        if not probe:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"'{upload_file.filename}' is empty.",
+            )
 
-    # Save original file to input_files/ as 01_<filename> (raw file, no extension change)
-    # This preserves the original uploaded file for reference
+    # Hash the body in streaming chunks; identical content served from cache
+    hasher = hashlib.blake2b(digest_size=16)
+    while chunk := await upload_file.read(_UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+    await upload_file.seek(0)
+    cache_key = hasher.hexdigest()
+
+    cached = _get_cached_result(cache_key)
+    if cached is not None:
+        logger.info("Serving '%s' from extraction cache.", upload_file.filename or "unknown")
+        result = dict(cached)
+        result["file_name"] = upload_file.filename or "unknown"
+        return result
+
+    # Open the reference copy in input_files/ as 01_<filename>; chunks are
+    # teed into it while the body streams to LLMWhisperer, so the file is
+    # never held in memory in full
+    input_sink = None
+    input_path = None
     try:
         input_path = get_input_path(upload_file.filename or "unknown", prefix="01")
         # Add original extension if it exists
@@ -53,69 +156,83 @@ async def process_upload_file(upload_file: UploadFile) -> Dict[str, Any]:
             original_ext = Path(upload_file.filename).suffix
             if original_ext:
                 input_path = input_path.with_suffix(original_ext)
-        save_bytes(input_path, file_bytes)
-        logger.info("Saved input file to %s", input_path)
+        ensure_folders()
+        input_path.parent.mkdir(parents=True, exist_ok=True)
+        input_sink = await asyncio.to_thread(open, input_path, "wb")
     except Exception as e:
-        logger.warning(f"Failed to save input file: {e}")
+        logger.warning(f"Failed to open input file for saving: {e}")
         # Continue processing even if saving fails
 
-    headers = {
-        "unstract-key": LLMWHISPERER_API_KEY,
-        "Content-Type": "application/octet-stream",
-    }
-
-    params = {
-        "mode": "form",
-        "output_mode": "layout_preserving",
-        "add_line_nos": "true",
-    }
-
-    async with httpx.AsyncClient(timeout=httpx.Timeout(180.0)) as client:
-        try:
-            response = await client.post(
-                f"{LLMWHISPERER_BASE_URL.rstrip('/')}/whisper",
-                params=params,
-                content=file_bytes,
-                headers=headers,
-            )
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(
-                status_code=exc.response.status_code,
-                detail=f"LLMWhisperer upload failed: {exc.response.text}",
-            ) from exc
-        except httpx.HTTPError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Failed to reach LLMWhisperer: {exc}",
-            ) from exc
-
-        payload = response.json()
-        logger.info(f"LLMWhisperer initial response: {payload}")
-        whisper_hash = _extract_whisper_hash(payload)
-
-        extraction = await _poll_until_complete(
-            client=client,
-            whisper_hash=whisper_hash,
-            headers={"unstract-key": LLMWHISPERER_API_KEY},
+    client = await get_client()
+    try:
+        response = await client.post(
+            "/whisper",
+            params=_WHISPER_PARAMS,
+            content=_stream_upload_body(upload_file, input_sink),
+            headers=_UPLOAD_HEADERS,
         )
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(
+            status_code=exc.response.status_code,
+            detail=f"LLMWhisperer upload failed: {exc.response.text}",
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to reach LLMWhisperer: {exc}",
+        ) from exc
+    finally:
+        if input_sink is not None:
+            try:
+                await asyncio.to_thread(input_sink.close)
+                logger.info("Saved input file to %s", input_path)
+            except Exception as e:
+                logger.warning(f"Failed to save input file: {e}")
+
+    payload = orjson.loads(response.content)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("LLMWhisperer initial response: %s", orjson.dumps(payload).decode())
+    whisper_hash = _extract_whisper_hash(payload)
+
+    await _POLL_COORDINATOR.wait_for_completion(whisper_hash, _AUTH_HEADERS)
+
+    # Fetch highlight data concurrently with the retrieve call; it is only
+    # awaited (and cancelled otherwise) when retrieve lacks inline metadata
+    highlight_task = asyncio.create_task(get_highlight_data(whisper_hash))
+    try:
+        extraction = await _retrieve_result(whisper_hash, _AUTH_HEADERS)
+    except Exception:
+        highlight_task.cancel()
+        raise
 
     # Try multiple paths to find result_text (API structure varies)
     result_text = _extract_result_text(extraction)
-    
-    # Get highlight data using SDK
-    highlight_result = await get_highlight_data(whisper_hash)
-    
-    if highlight_result and "line_metadata" in highlight_result:
-        line_metadata = highlight_result["line_metadata"]
+
+    # If the retrieve payload already carries line_metadata, use it directly
+    # and skip waiting on the highlight round-trip
+    inline_metadata = _extract_nested(extraction, "line_metadata")
+    if inline_metadata:
+        line_metadata = inline_metadata
+        highlight_task.cancel()
     else:
-        logger.warning("No highlight metadata from SDK, using fallback generation.")
-        line_metadata = _extract_nested(extraction, "line_metadata") or []
+        try:
+            highlight_result = await highlight_task
+        except asyncio.CancelledError:
+            highlight_result = None
+
+        if highlight_result and "line_metadata" in highlight_result:
+            line_metadata = highlight_result["line_metadata"]
+        else:
+            logger.warning("No highlight metadata from SDK and none in retrieve payload.")
+            line_metadata = []
     
     # Normalize bounding_boxes structure
     # Generate word-level boxes from line-level boxes
     if line_metadata and result_text:
-        words = _generate_word_level_boxes_from_line_metadata(line_metadata, result_text)
+        word_records = _generate_word_level_boxes_from_line_metadata(line_metadata, result_text)
+        # Serialize to the legacy dict shape only here, at the API boundary
+        words = [word.as_dict() for word in word_records]
         bounding_boxes = {
             "line_metadata": line_metadata,
             "words": words
@@ -127,54 +244,105 @@ async def process_upload_file(upload_file: UploadFile) -> Dict[str, Any]:
             "words": []
         }
     
-    return {
+    result = {
         "file_name": upload_file.filename or "unknown",
         "result_text": result_text,
         "whisper_hash": whisper_hash,
         "bounding_boxes": bounding_boxes,
         "pages": _extract_nested(extraction, "pages"),
     }
+    _store_cached_result(cache_key, result)
+    return result
+
+
+def _get_cached_result(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached extraction result if present and not expired."""
+    entry = _RESULT_CACHE.get(cache_key)
+    if entry is None:
+        return None
+    stored_at, result = entry
+    if time.monotonic() - stored_at > _RESULT_CACHE_TTL:
+        _RESULT_CACHE.pop(cache_key, None)
+        return None
+    _RESULT_CACHE.move_to_end(cache_key)
+    return result
+
+
+def _store_cached_result(cache_key: str, result: Dict[str, Any]) -> None:
+    """Store an extraction result, evicting the oldest entries over capacity."""
+    _RESULT_CACHE[cache_key] = (time.monotonic(), result)
+    _RESULT_CACHE.move_to_end(cache_key)
+    while len(_RESULT_CACHE) > _RESULT_CACHE_MAX:
+        _RESULT_CACHE.popitem(last=False)
+
+
+async def _stream_upload_body(upload_file: UploadFile, sink) -> AsyncIterator[bytes]:
+    """Yield upload chunks, teeing them into the input-file sink when open."""
+    while chunk := await upload_file.read(_UPLOAD_CHUNK_SIZE):
+        if sink is not None:
+            try:
+                # Disk I/O happens on a worker thread so a slow disk never
+                # stalls the event loop or the in-flight upload
+                await asyncio.to_thread(sink.write, chunk)
+            except Exception as exc:
+                logger.warning(f"Failed to save input file chunk: {exc}")
+                sink = None
+        yield chunk
+
+
+# Candidate paths for result_text, in priority order (API structure varies)
+_RESULT_TEXT_PATHS = (
+    ("result_text",),
+    ("extraction", "result_text"),
+    ("extraction", "extraction", "result_text"),
+    ("text",),
+    ("extraction", "text"),
+)
+
+
+def _walk(data: Any, path: Tuple[str, ...]) -> Any:
+    """Follow a key path through nested dicts, returning None on any miss."""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+        if data is None:
+            return None
+    return data
 
 
 def _extract_result_text(data: Dict[str, Any]) -> str:
     """Try multiple paths to extract result_text from the response."""
-    # Direct path
+    # Fast path: top-level key present
     if data.get("result_text"):
         return data["result_text"]
-    
-    # Nested under extraction
-    extraction = data.get("extraction", {})
-    if isinstance(extraction, dict) and extraction.get("result_text"):
-        return extraction["result_text"]
-    
-    # Nested under extraction.extraction (double nested)
-    inner = extraction.get("extraction", {})
-    if isinstance(inner, dict) and inner.get("result_text"):
-        return inner["result_text"]
-    
-    # Try "text" key as fallback
-    if data.get("text"):
-        return data["text"]
-    if extraction.get("text"):
-        return extraction["text"]
-    
+
+    for path in _RESULT_TEXT_PATHS[1:]:
+        value = _walk(data, path)
+        if value:
+            return value
+
     logger.warning(f"Could not find result_text in response. Keys: {list(data.keys())}")
     return ""
 
 
+# Memoized candidate paths per nested key, so repeated lookups (line_metadata,
+# pages on every upload) reuse precompiled path tuples instead of rebuilding them
+_NESTED_PATHS: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+
+
 def _extract_nested(data: Dict[str, Any], key: str) -> Any:
     """Extract a key from nested response structure."""
-    if data.get(key):
-        return data[key]
-    
-    extraction = data.get("extraction", {})
-    if isinstance(extraction, dict):
-        if extraction.get(key):
-            return extraction[key]
-        inner = extraction.get("extraction", {})
-        if isinstance(inner, dict) and inner.get(key):
-            return inner[key]
-    
+    paths = _NESTED_PATHS.get(key)
+    if paths is None:
+        paths = ((key,), ("extraction", key), ("extraction", "extraction", key))
+        _NESTED_PATHS[key] = paths
+
+    for path in paths:
+        value = _walk(data, path)
+        if value:
+            return value
+
     return None
 
 
@@ -183,6 +351,9 @@ def _extract_whisper_hash(payload: Dict[str, Any]) -> str:
         payload.get("whisper_hash"),
         payload.get("hash"),
         payload.get("document_hash"),
+        payload.get("whisper_hash_id"),
+        payload.get("whisper_id"),
+        payload.get("job_id"),
     ]
     for candidate in candidates:
         if candidate:
@@ -194,59 +365,185 @@ def _extract_whisper_hash(payload: Dict[str, Any]) -> str:
     )
 
 
-async def _poll_until_complete(
-    client: httpx.AsyncClient,
-    whisper_hash: str,
-    headers: Dict[str, str],
-) -> Dict[str, Any]:
-    for _ in range(MAX_POLL_ATTEMPTS):
+class _PendingPoll:
+    """Book-keeping for one whisper hash awaiting completion."""
+
+    __slots__ = ("headers", "future", "delay", "next_due", "deadline")
+
+    def __init__(self, headers: Dict[str, str], future: "asyncio.Future", now: float) -> None:
+        self.headers = headers
+        self.future = future
+        self.delay = _POLL_INITIAL_DELAY
+        self.next_due = now + _POLL_INITIAL_DELAY * random.uniform(0.8, 1.2)
+        self.deadline = now + POLL_DEADLINE_SECONDS
+
+
+class _PollingCoordinator:
+    """
+    Coalesce status polling across concurrent uploads.
+
+    Instead of every upload running its own poll loop against
+    /whisper-status, each upload registers its whisper hash here and awaits
+    a future. A single background task checks every pending hash per poll
+    interval and resolves futures as extractions reach a terminal state,
+    so M concurrent uploads cost one poll task instead of M.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, _PendingPoll] = {}
+        self._task: Optional["asyncio.Task"] = None
+
+    async def wait_for_completion(
+        self,
+        whisper_hash: str,
+        headers: Dict[str, str],
+    ) -> Dict[str, Any]:
+        """Register a hash and wait until its extraction reaches a terminal status."""
+        # Identical files in one request (processed concurrently) can
+        # yield the same whisper hash; overwriting the existing entry
+        # would strand its caller's future, so share it instead
+        existing = self._pending.get(whisper_hash)
+        if existing is not None and not existing.future.done():
+            return await existing.future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[whisper_hash] = _PendingPoll(headers, future, loop.time())
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+        return await future
+
+    async def _poll_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            now = loop.time()
+            due: List[Tuple[str, _PendingPoll]] = []
+            for whisper_hash, entry in list(self._pending.items()):
+                if entry.future.done():
+                    self._pending.pop(whisper_hash, None)
+                    continue
+                if now >= entry.deadline:
+                    self._resolve(
+                        whisper_hash,
+                        entry,
+                        exception=HTTPException(
+                            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                            detail="Timed out waiting for LLMWhisperer to finish processing.",
+                        ),
+                    )
+                    continue
+                if now >= entry.next_due:
+                    due.append((whisper_hash, entry))
+            if due:
+                # Status checks for hashes due in the same tick go out in
+                # parallel over the pooled client rather than back to back
+                await asyncio.gather(
+                    *(self._poll_one(whisper_hash, entry) for whisper_hash, entry in due)
+                )
+            if self._pending:
+                next_due = min(entry.next_due for entry in self._pending.values())
+                await asyncio.sleep(max(next_due - loop.time(), 0.05))
+
+    async def _poll_one(self, whisper_hash: str, entry: _PendingPoll) -> None:
+        # Any failure here must resolve this entry and nothing else: an
+        # escaping exception would kill the shared loop and strand every
+        # other pending upload without its 504 deadline
         try:
-            status_response = await client.get(
-                f"{LLMWHISPERER_BASE_URL.rstrip('/')}/whisper-status",
-                params={"whisper_hash": whisper_hash},
-                headers=headers,
+            status_payload = await _check_status(whisper_hash, entry.headers)
+
+            status_value = status_payload.get("status") or ""
+            if not status_value.islower():
+                status_value = status_value.lower()
+
+            if status_value in _STATUS_DONE:
+                self._resolve(whisper_hash, entry, result=status_payload)
+                return
+
+            if status_value in _STATUS_FAILED:
+                message = status_payload.get("message") or "Unknown error"
+                self._resolve(
+                    whisper_hash,
+                    entry,
+                    exception=HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail=f"LLMWhisperer extraction failed for {whisper_hash}: {message}",
+                    ),
+                )
+                return
+        except HTTPException as exc:
+            self._resolve(whisper_hash, entry, exception=exc)
+            return
+        except Exception as exc:
+            # e.g. a malformed status body (orjson.JSONDecodeError) or a
+            # non-object JSON payload (AttributeError on .get)
+            logger.error(f"Malformed status response for {whisper_hash}: {exc}")
+            self._resolve(
+                whisper_hash,
+                entry,
+                exception=HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail=f"Invalid status response from LLMWhisperer for {whisper_hash}.",
+                ),
             )
-            status_response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            raise HTTPException(
-                status_code=exc.response.status_code,
-                detail=f"LLMWhisperer status check failed: {exc.response.text}",
-            ) from exc
-        except httpx.HTTPError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Failed to poll LLMWhisperer status: {exc}",
-            ) from exc
+            return
+
+        # Still processing: back off with jitter before the next check
+        entry.next_due = asyncio.get_running_loop().time() + entry.delay * random.uniform(0.8, 1.2)
+        entry.delay = min(entry.delay * _POLL_BACKOFF_FACTOR, _POLL_MAX_DELAY)
+
+    def _resolve(
+        self,
+        whisper_hash: str,
+        entry: _PendingPoll,
+        result: Optional[Dict[str, Any]] = None,
+        exception: Optional[Exception] = None,
+    ) -> None:
+        self._pending.pop(whisper_hash, None)
+        if entry.future.done():
+            return
+        if exception is not None:
+            entry.future.set_exception(exception)
+        else:
+            entry.future.set_result(result)
 
-        status_payload = status_response.json()
-        status_value = (status_payload.get("status") or "").lower()
 
-        if status_value in {"processed", "completed", "done"}:
-            return await _retrieve_result(client, whisper_hash, headers)
+_POLL_COORDINATOR = _PollingCoordinator()
 
-        if status_value in {"failed", "error"}:
-            message = status_payload.get("message") or "Unknown error"
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"LLMWhisperer extraction failed for {whisper_hash}: {message}",
-            )
 
-        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+async def _check_status(
+    whisper_hash: str,
+    headers: Dict[str, str],
+) -> Dict[str, Any]:
+    client = await get_client()
+    try:
+        status_response = await client.get(
+            "/whisper-status",
+            params={"whisper_hash": whisper_hash},
+            headers=headers,
+        )
+        status_response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(
+            status_code=exc.response.status_code,
+            detail=f"LLMWhisperer status check failed: {exc.response.text}",
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to poll LLMWhisperer status: {exc}",
+        ) from exc
 
-    raise HTTPException(
-        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-        detail="Timed out waiting for LLMWhisperer to finish processing.",
-    )
+    return orjson.loads(status_response.content)
 
 
 async def _retrieve_result(
-    client: httpx.AsyncClient,
     whisper_hash: str,
     headers: Dict[str, str],
 ) -> Dict[str, Any]:
+    client = await get_client()
     try:
         retrieve_response = await client.get(
-            f"{LLMWHISPERER_BASE_URL.rstrip('/')}/whisper-retrieve",
+            "/whisper-retrieve",
             params={"whisper_hash": whisper_hash},
             headers=headers,
         )
@@ -262,27 +559,68 @@ async def _retrieve_result(
             detail=f"Failed to retrieve LLMWhisperer result: {exc}",
         ) from exc
 
-    result = retrieve_response.json()
-    logger.info(f"LLMWhisperer retrieve response keys: {list(result.keys()) if isinstance(result, dict) else type(result)}")
+    result = orjson.loads(retrieve_response.content)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "LLMWhisperer retrieve response keys: %s",
+            list(result.keys()) if isinstance(result, dict) else type(result),
+        )
     return result
 
 
 
 
+class _Word:
+    """
+    Lightweight per-word box record.
+
+    Uses __slots__ instead of a nested dict so that documents with tens of
+    thousands of words don't pay one dict (plus a nested bbox dict) per word.
+    Serialized back to the legacy dict shape only at the API boundary.
+    """
+
+    __slots__ = ("index", "text", "page", "x", "y", "width", "height", "page_height")
+
+    def __init__(self, index, text, page, x, y, width, height, page_height):
+        self.index = index
+        self.text = text
+        self.page = page
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.page_height = page_height
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Serialize to the legacy nested-dict shape used by the API."""
+        return {
+            "index": self.index,
+            "text": self.text,
+            "page": self.page,
+            "bbox": {
+                "x": self.x,
+                "y": self.y,
+                "width": self.width,
+                "height": self.height,
+            },
+            "page_height": self.page_height,
+        }
+
+
 def _generate_word_level_boxes_from_line_metadata(
     line_metadata: List[Dict[str, Any]], text: str
-) -> List[Dict[str, Any]]:
+) -> List[_Word]:
     """
     Create word-level bounding boxes using real raw_box from highlight API.
-    
+
     Args:
         line_metadata: List of line metadata dicts with raw_box
         text: The layout-preserving text (for reference, not used directly)
-        
+
     Returns:
-        List of word boxes with index, page, text, bbox coordinates
+        List of _Word records with index, page, text and bbox coordinates
     """
-    words = []
+    words: List[_Word] = []
     global_word_index = 0
     
     for line in line_metadata:
@@ -294,14 +632,24 @@ def _generate_word_level_boxes_from_line_metadata(
             continue
         
         page, base_y, height, page_height = raw_box[0], raw_box[1], raw_box[2], raw_box[3]
-        
+
+        # Coerce the box values once per line, not once per token
+        page = int(page)
+        base_y = float(base_y)
+        height = float(height)
+        page_height = float(page_height) if page_height else 0
+
+        # All-zero boxes are blank-line placeholders with no geometry;
+        # generate no word boxes for them
+        if not (page or base_y or height or page_height):
+            continue
+
         line_text = line.get("text", "")
         if not line_text:
             continue
         
         # Remove hex line numbers for word extraction
-        import re
-        line_text = re.sub(r'0x[0-9A-Fa-f]+:\s*', '', line_text).strip()
+        line_text = _HEX_LINE_NO_RE.sub('', line_text).strip()
         
         tokens = line_text.split()
         if not tokens:
@@ -323,18 +671,16 @@ def _generate_word_level_boxes_from_line_metadata(
             token_width_ratio = len(token) / total_chars
             token_width = line_width * token_width_ratio
             
-            words.append({
-                "index": global_word_index,
-                "text": token,
-                "page": int(page),
-                "bbox": {
-                    "x": x_cursor,
-                    "y": float(base_y),
-                    "width": token_width,
-                    "height": float(height),
-                },
-                "page_height": float(page_height) if page_height else 0
-            })
+            words.append(_Word(
+                index=global_word_index,
+                text=token,
+                page=page,
+                x=x_cursor,
+                y=base_y,
+                width=token_width,
+                height=height,
+                page_height=page_height,
+            ))
             
             x_cursor += token_width
             global_word_index += 1
@@ -360,9 +706,12 @@ async def get_highlight_data(whisper_hash: str) -> Optional[Dict[str, Any]]:
         line_range = "1-5000"
         logger.info(f"Requesting highlight data via SDK for range {line_range}")
         
-        data = llmw_client.get_highlight_data(
+        # The SDK call is synchronous; run it in a worker thread so it
+        # doesn't block the event loop for other requests
+        data = await asyncio.to_thread(
+            llmw_client.get_highlight_data,
             whisper_hash=whisper_hash,
-            lines=line_range
+            lines=line_range,
         )
         
         if not data:
@@ -378,12 +727,21 @@ async def get_highlight_data(whisper_hash: str) -> Optional[Dict[str, Any]]:
                 logger.warning(f"Missing raw for line {line_no}, skipping.")
                 continue
             
-            # raw = [page, base_y, height, page_height]
-            page = entry.get("page", raw[0])
-            base_y = entry.get("base_y", raw[1])
-            height = entry.get("height", raw[2])
-            page_height = entry.get("page_height", raw[3])
-            
+            # raw = [page, base_y, height, page_height]; coerce once here so
+            # downstream consumers never re-parse the same values per word
+            try:
+                page = int(entry.get("page", raw[0]))
+                base_y = float(entry.get("base_y", raw[1]))
+                height = float(entry.get("height", raw[2]))
+                page_height = float(entry.get("page_height", raw[3]))
+            except (TypeError, ValueError):
+                logger.warning(f"Non-numeric raw box for line {line_no}, skipping.")
+                continue
+
+            # All-zero boxes are placeholders for blank lines. Keep them:
+            # the saved-artifact formatter pairs lines with text by list
+            # position, so dropping entries would shift every following
+            # line's text. The word-box generator skips them instead.
             line_metadata.append({
                 "line_no": line_no,
                 "raw_box": [page, base_y, height, page_height],
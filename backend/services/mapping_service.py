@@ -1,11 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
-from collections import defaultdict
+import random
+import re
+import string
+import sys
+import types
+from bisect import bisect_right
+from collections import OrderedDict
+from copy import deepcopy
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+try:
+    import orjson
+except ImportError:  # degrade to stdlib json behind an orjson-shaped shim
+    class _OrjsonShim:
+        JSONDecodeError = json.JSONDecodeError
+        OPT_INDENT_2 = 1
+
+        @staticmethod
+        def loads(data):
+            return json.loads(data)
+
+        @staticmethod
+        def dumps(obj, option=None):
+            return json.dumps(obj, indent=2 if option else None).encode()
+
+    orjson = _OrjsonShim()
 
 from services.groq_service import GroqService
 
@@ -14,33 +43,163 @@ logger = logging.getLogger(__name__)
 MERGE_GAP_RATIO = 0.5
 LINE_ALIGNMENT_RATIO = 0.6
 
-# Load standard template at module import
-_TEMPLATE_CACHE: Dict[str, Dict[str, Any]] = {}
+# Interned keys shared by every per-field result dict, so the hot dict
+# builds hash by identity instead of re-hashing the strings
+_K_VALUE = sys.intern("value")
+_K_WORD_INDEXES = sys.intern("word_indexes")
+
+# Base delay for Groq retry backoff; doubled per attempt with jitter
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+# Hard ceiling per extraction attempt; a hung upstream call becomes a
+# TimeoutError and goes through the normal retry path instead of pinning
+# the request until the transport gives up
+_EXTRACT_TIMEOUT = float(os.getenv("GROQ_EXTRACT_TIMEOUT", "60"))
+
+# Concurrency cap for the per-document fallback when a batched
+# extraction cannot be parsed
+_FALLBACK_MAX_CONCURRENCY = int(os.getenv("EXTRACT_FALLBACK_CONCURRENCY", "4"))
+
+# LRU cache of extraction results keyed by document text and template keys.
+# Re-running extraction on an unchanged document (a common frontend retry)
+# skips the LLM round-trip entirely.
+_EXTRACT_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_EXTRACT_CACHE_MAX = int(os.getenv("EXTRACT_CACHE_SIZE", "128"))
+
+# Documents longer than this are split on blank lines and extracted as
+# parallel chunks, merged field-by-field with the first non-empty value
+# winning; keeps prompts inside the model's practical context budget
+_MAX_PROMPT_CHARS = int(os.getenv("EXTRACT_MAX_PROMPT_CHARS", "60000"))
+
 _TEMPLATE_DIR = Path(__file__).parent.parent
 
 
-def _load_template(template_name: str = "standard_template") -> Dict[str, Any]:
-    """Load template JSON file from backend directory."""
-    if template_name in _TEMPLATE_CACHE:
-        return _TEMPLATE_CACHE[template_name]
+@lru_cache(maxsize=8)
+def _load_template(template_name: str = "standard_template") -> Mapping[str, Any]:
+    """Load template JSON file from backend directory (cached per name).
 
+    Returns a read-only mapping: the instance is shared across requests
+    (and its identity keys several caches), so accidental mutation by a
+    caller must not be possible.
+    """
     template_path = _TEMPLATE_DIR / f"{template_name}.json"
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template file not found: {template_path}")
+    try:
+        raw = template_path.read_bytes()
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Template file not found: {template_path}") from exc
 
     try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template = json.load(f)
-        _TEMPLATE_CACHE[template_name] = template
+        template = orjson.loads(raw)
         logger.info(f"Loaded template: {template_name}")
-        return template
-    except json.JSONDecodeError as exc:
+        return types.MappingProxyType(template)
+    except orjson.JSONDecodeError as exc:
         raise ValueError(f"Invalid JSON in template file {template_path}: {exc}") from exc
 
 
 # Load standard template at module import
 STANDARD_TEMPLATE = _load_template("standard_template")
 
+# Precomputed views of the standard template; per-request code checks
+# `template is STANDARD_TEMPLATE` and skips rebuilding these each call
+_STANDARD_TEMPLATE_KEYS = list(STANDARD_TEMPLATE.keys())
+_STANDARD_TEMPLATE_KEYSET = frozenset(_STANDARD_TEMPLATE_KEYS)
+_STANDARD_TEMPLATE_KEYS_JSON = orjson.dumps(
+    _STANDARD_TEMPLATE_KEYS, option=orjson.OPT_INDENT_2
+).decode()
+
+# Keys JSON per non-standard template, keyed by id(); templates come from
+# the lru_cached loader, so they are process-lifetime singletons and their
+# identity is a stable cache key
+_TEMPLATE_KEYS_JSON_CACHE: Dict[int, str] = {}
+
+
+# Key list and key set per non-standard template, keyed by identity like
+# the keys-JSON cache above
+_TEMPLATE_META: Dict[int, Tuple[List[str], frozenset]] = {}
+
+
+def _template_meta(template: Dict[str, Any]) -> Tuple[List[str], frozenset]:
+    """Return (ordered key list, key set) for a template, cached per template."""
+    if template is STANDARD_TEMPLATE:
+        return _STANDARD_TEMPLATE_KEYS, _STANDARD_TEMPLATE_KEYSET
+
+    meta = _TEMPLATE_META.get(id(template))
+    if meta is None:
+        keys = list(template.keys())
+        meta = (keys, frozenset(keys))
+        _TEMPLATE_META[id(template)] = meta
+    return meta
+
+
+def _template_keys_json(template: Dict[str, Any]) -> str:
+    """Return the indented keys JSON for a template, cached per template."""
+    if template is STANDARD_TEMPLATE:
+        return _STANDARD_TEMPLATE_KEYS_JSON
+
+    cached = _TEMPLATE_KEYS_JSON_CACHE.get(id(template))
+    if cached is None:
+        cached = orjson.dumps(list(template.keys()), option=orjson.OPT_INDENT_2).decode()
+        _TEMPLATE_KEYS_JSON_CACHE[id(template)] = cached
+    return cached
+
+
+# GroqService is stateless apart from env-derived configuration; one lazy
+# instance serves every extraction instead of a fresh object per request
+_GROQ_SERVICE: GroqService | None = None
+
+
+def _get_groq_service() -> GroqService:
+    """Return the shared GroqService, creating it on first use."""
+    global _GROQ_SERVICE
+    if _GROQ_SERVICE is None:
+        _GROQ_SERVICE = GroqService()
+    return _GROQ_SERVICE
+
+
+# Optional speculative model: when set, every extraction races the
+# configured model against this (typically smaller/faster) one and takes
+# the first response that parses as JSON
+_SPECULATIVE_MODEL = os.getenv("GROQ_SPECULATIVE_MODEL")
+
+
+async def _call_llm(groq_service: GroqService, prompt: str) -> str:
+    """Dispatch a prompt, optionally racing a speculative second model."""
+    if not _SPECULATIVE_MODEL:
+        return await groq_service.extract(prompt)
+
+    pending = {
+        asyncio.create_task(groq_service.extract(prompt)),
+        asyncio.create_task(groq_service.extract(prompt, model=_SPECULATIVE_MODEL)),
+    }
+    unparseable = None
+    failure = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    response = task.result()
+                except Exception as exc:
+                    failure = exc
+                    continue
+                # Accept only responses that parse, so a fast but broken
+                # answer never beats a correct slower one
+                try:
+                    orjson.loads(_strip_code_fences(response.strip()))
+                except orjson.JSONDecodeError:
+                    unparseable = response
+                    continue
+                return response
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if unparseable is not None:
+        # Let the caller's parse path log and degrade as usual
+        return unparseable
+    raise failure
+
 
 def normalize_bounding_boxes(boxes: Dict[str, Any] | List[Any] | None) -> Dict[str, Any]:
     """
@@ -104,32 +263,138 @@ async def extract_fields_from_text(
         logger.warning("Invalid or empty bounding boxes provided, extraction will proceed without word indexes")
         bounding_boxes = {}
 
+    # Identical text + template pairs are served from the result cache.
+    # Bounding boxes are derived from the same document, so text identity
+    # implies the same word stream in practice.
+    cache_key = _extract_cache_key(text, template)
+    cached = _EXTRACT_CACHE.get(cache_key)
+    if cached is not None:
+        _EXTRACT_CACHE.move_to_end(cache_key)
+        logger.info("Serving field extraction from cache")
+        return deepcopy(cached)
+
+    # Oversized documents are extracted in chunks; everything else goes
+    # through the single-prompt pipeline
+    if len(text) > _MAX_PROMPT_CHARS:
+        parsed_response = await _extract_chunked_fields(text, template)
+    else:
+        parsed_response = await _request_llm_fields(text, template)
+
+    if parsed_response is None:
+        return {"fields": _create_empty_fields(template)}
+
+    result = {"fields": _map_parsed_fields(parsed_response, text, bounding_boxes)}
+
+    _EXTRACT_CACHE[cache_key] = deepcopy(result)
+    _EXTRACT_CACHE.move_to_end(cache_key)
+    while len(_EXTRACT_CACHE) > _EXTRACT_CACHE_MAX:
+        _EXTRACT_CACHE.popitem(last=False)
+
+    return result
+
+
+async def _request_llm_fields(text: str, template: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Run the prompt/retry/parse pipeline for one piece of text."""
     # Build LLM prompt - only extract values, no positional metadata
     # Word index mapping will be done backend-side using LLMWhisperer highlight data
     prompt = _build_extraction_prompt(text, template)
 
     # Call Groq service
-    groq_service = GroqService()
+    groq_service = _get_groq_service()
     max_retries = 2
     llm_response = None
 
     for attempt in range(max_retries):
         try:
-            llm_response = await groq_service.extract(prompt)
+            llm_response = await asyncio.wait_for(
+                _call_llm(groq_service, prompt), timeout=_EXTRACT_TIMEOUT
+            )
             break
         except Exception as exc:
             if attempt == max_retries - 1:
                 logger.error(f"Failed to get LLM response after {max_retries} attempts: {exc}")
-                return {"fields": _create_empty_fields(template)}
-            logger.warning(f"LLM request failed (attempt {attempt + 1}), retrying...")
+                return None
+            delay = _retry_delay(exc, attempt)
+            logger.warning(f"LLM request failed (attempt {attempt + 1}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
 
     if not llm_response:
-        return {"fields": _create_empty_fields(template)}
+        return None
 
     # Parse LLM JSON response - only expects value (no word_indexes from Groq)
-    parsed_response = _parse_llm_response(llm_response, template)
+    return _parse_llm_response(llm_response, template)
 
-    # Map field values to word indexes using exact string matching
+
+async def _extract_chunked_fields(
+    text: str, template: Dict[str, Any]
+) -> Dict[str, Any] | None:
+    """Extract an oversized document as parallel chunks and merge the values."""
+    chunks = _split_on_blank_lines(text)
+    logger.info(f"Splitting {len(text)}-char document into {len(chunks)} chunks for extraction")
+
+    chunk_results = await asyncio.gather(
+        *(_request_llm_fields(chunk, template) for chunk in chunks)
+    )
+
+    merged: Dict[str, Any] | None = None
+    for parsed in chunk_results:
+        if parsed is None:
+            continue
+        if merged is None:
+            merged = parsed
+            continue
+        # First non-empty value wins; later chunks only fill gaps
+        for key, field in parsed.items():
+            if field.get(_K_VALUE) and not merged.get(key, {}).get(_K_VALUE):
+                merged[key] = field
+    return merged
+
+
+def _split_on_blank_lines(text: str) -> List[str]:
+    """
+    Split text into chunks of roughly _MAX_PROMPT_CHARS on blank lines.
+
+    A single paragraph longer than the budget stays in one oversized chunk
+    rather than being cut mid-line.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for paragraph in text.split("\n\n"):
+        paragraph_len = len(paragraph) + 2
+        if current and current_len + paragraph_len > _MAX_PROMPT_CHARS:
+            chunks.append("\n\n".join(current))
+            current, current_len = [], 0
+        current.append(paragraph)
+        current_len += paragraph_len
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _extract_cache_key(text: str, template: Dict[str, Any]) -> str:
+    """Cache key covering the document text and the template's key set."""
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(text.encode("utf-8"))
+    hasher.update(repr(tuple(template.keys())).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Delay before the next Groq retry, honouring Retry-After when sent."""
+    headers = getattr(exc, "headers", None)
+    if headers:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), _RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+    return min(_RETRY_BASE_DELAY * (2 ** attempt), _RETRY_MAX_DELAY) * random.uniform(0.8, 1.2)
+
+
+def _build_words_list(text: str, bounding_boxes: Dict[str, Any]) -> List[str]:
+    """Build the ordered word-text list used for value matching."""
     # Use bounding_boxes.words if available (more reliable than tokenized text)
     words_list = []
     if isinstance(bounding_boxes, dict):
@@ -137,62 +402,147 @@ async def extract_fields_from_text(
         if isinstance(words, list):
             # Build ordered list of word texts from bounding_boxes.words
             words_list = [word.get("text", "").strip() if isinstance(word, dict) else str(word).strip() for word in words]
-    
+
     # Fallback to tokenized text if words not available
     if not words_list:
         # Remove hex line numbers and split
-        import re
-        text_clean = re.sub(r'0x[0-9A-Fa-f]+:\s*', '', text)
-        words_list = text_clean.split()
+        words_list = _HEX_LINE_NO_RE.sub('', text).split()
         logger.warning("Using fallback tokenized text for word matching (bounding_boxes.words not available)")
-    
+
+    return words_list
+
+
+def _map_parsed_fields(
+    parsed_response: Dict[str, Any], text: str, bounding_boxes: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Map parsed field values to word indexes against one document."""
+    # Build the match index once; every field lookup reuses it
+    match_index = _WordMatchIndex(_build_words_list(text, bounding_boxes), bounding_boxes)
+
     result_fields = {}
     for field_key, field_data in parsed_response.items():
         value = field_data.get("value")
-        if not value or value is None:
+        if not value:
             result_fields[field_key] = {
-                "value": "",
-                "word_indexes": [],
+                _K_VALUE: "",
+                _K_WORD_INDEXES: [],
             }
             continue
-        
-        # Find word indexes by exact string matching
-        # Use words from bounding_boxes.words if available, otherwise use tokenized text
-        word_indexes = _find_word_indexes_for_value_from_words(value, words_list, bounding_boxes)
-        
+
+        # LLM values are normally strings already; coerce only the odd
+        # numeric/bool value the model returns unquoted, and strip once
+        # here so the matcher receives a ready target
+        if not isinstance(value, str):
+            value = str(value)
+        value = value.strip()
+        if not value:
+            result_fields[field_key] = {
+                _K_VALUE: "",
+                _K_WORD_INDEXES: [],
+            }
+            continue
+
+        # Find word indexes by exact string matching against the shared index
         result_fields[field_key] = {
-            "value": str(value),
-            "word_indexes": word_indexes,
+            _K_VALUE: value,
+            _K_WORD_INDEXES: _find_word_indexes(value, match_index),
         }
 
-    return {"fields": result_fields}
+    return result_fields
 
 
-def _build_extraction_prompt(text: str, template: Dict[str, Any]) -> str:
+async def extract_fields_from_texts(
+    items: List[Tuple[str, Dict[str, Any]]], template: Dict[str, Any]
+) -> List[Dict[str, Any]]:
     """
-    Build prompt for LLM extraction.
-    
-    NOTE: We only extract VALUES, not word_indexes.
-    Word index mapping is done backend-side using exact string matching.
-    This ensures precise word-level highlighting without relying on LLM positional guesses.
+    Extract fields for several documents with a single LLM round-trip.
+
+    Each item is a (text, bounding_boxes) pair. Documents are packed into
+    one prompt separated by "### DOC n" markers and the model returns one
+    result object per document number; word-index mapping then runs locally
+    per document. If the batched response cannot be parsed, extraction
+    falls back to one extract_fields_from_text call per document.
+
+    Args:
+        items: List of (text, bounding_boxes) pairs
+        template: Template dictionary with field keys
+
+    Returns:
+        One result dict (same shape as extract_fields_from_text) per item
     """
-    template_keys = list(template.keys())
-    template_keys_json = json.dumps(template_keys, indent=2)
+    if not items:
+        return []
+
+    if len(items) == 1:
+        text, bounding_boxes = items[0]
+        return [
+            await extract_fields_from_text(
+                text=text, bounding_boxes=bounding_boxes, template=template
+            )
+        ]
 
+    prompt = _build_batch_extraction_prompt([text for text, _ in items], template)
+
+    parsed = None
+    try:
+        llm_response = await _call_llm(_get_groq_service(), prompt)
+        parsed = orjson.loads(_strip_code_fences(llm_response.strip()))
+    except Exception as exc:
+        logger.warning(f"Batched extraction failed ({exc}); falling back to per-document calls")
+
+    if not isinstance(parsed, dict):
+        # Per-document fallback runs concurrently, bounded so a large
+        # batch cannot flood the Groq API with simultaneous calls
+        semaphore = asyncio.Semaphore(_FALLBACK_MAX_CONCURRENCY)
+
+        async def _extract_one(text: str, bounding_boxes: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await extract_fields_from_text(
+                    text=text, bounding_boxes=bounding_boxes, template=template
+                )
+
+        return list(
+            await asyncio.gather(
+                *(_extract_one(text, bounding_boxes) for text, bounding_boxes in items)
+            )
+        )
+
+    results = []
+    for n, (text, bounding_boxes) in enumerate(items):
+        doc_fields = parsed.get(str(n))
+        if not isinstance(doc_fields, dict):
+            logger.warning(f"Batched response missing document {n}; returning empty fields")
+            doc_fields = {}
+        validated = _validate_llm_fields(doc_fields, template)
+        results.append({"fields": _map_parsed_fields(validated, text, bounding_boxes)})
+
+    return results
+
+
+def _build_batch_extraction_prompt(texts: List[str], template: Dict[str, Any]) -> str:
+    """Build a single prompt covering several documents."""
     prompt_parts = [
-        "Extract field VALUES ONLY from the following layout-preserving text.",
+        "Extract field VALUES ONLY from each of the following layout-preserving documents.",
         "",
-        "Template field keys (extract ONLY these fields):",
-        template_keys_json,
+        "Template field keys (extract ONLY these fields, for every document):",
+        _template_keys_json(template),
         "",
-        "Layout-preserving text:",
-        text,
-        "",
-        "Return STRICT JSON in this exact format:",
+    ]
+    for n, text in enumerate(texts):
+        prompt_parts.append(f"### DOC {n}")
+        prompt_parts.append(text)
+        prompt_parts.append("")
+
+    prompt_parts.extend([
+        "Return STRICT JSON keyed by document number, in this exact format:",
         "{",
-        '  "field_key": {',
-        '    "value": "extracted value or null if not found"',
+        '  "0": {',
+        '    "field_key": {',
+        '      "value": "extracted value or null if not found"',
+        "    },",
+        "    ...",
         "  },",
+        '  "1": { ... },',
         "  ...",
         "}",
         "",
@@ -200,13 +550,77 @@ def _build_extraction_prompt(text: str, template: Dict[str, Any]) -> str:
         "- Never invent fields not in the template.",
         "- If a value is not found, return value=null.",
         "- Extract ONLY the value - do not compute word indexes or positions.",
-        "- Return the exact value as it appears in the text.",
+        "- Return the exact value as it appears in its document.",
         "- No explanations, no prose, only JSON.",
-    ]
+    ])
 
     return "\n".join(prompt_parts)
 
 
+# Static scaffold for the extraction prompt; only the keys JSON and the
+# document text vary per request
+_PROMPT_TEMPLATE = """Extract field VALUES ONLY from the following layout-preserving text.
+
+Template field keys (extract ONLY these fields):
+{template_keys_json}
+
+Layout-preserving text:
+{text}
+
+Return STRICT JSON in this exact format:
+{{
+  "field_key": {{
+    "value": "extracted value or null if not found"
+  }},
+  ...
+}}
+
+Rules:
+- Never invent fields not in the template.
+- If a value is not found, return value=null.
+- Extract ONLY the value - do not compute word indexes or positions.
+- Return the exact value as it appears in the text.
+- No explanations, no prose, only JSON."""
+
+# The document text is by far the largest part of the prompt; splitting
+# the scaffold around {text} lets each prompt be built as two string
+# concatenations instead of a .format() pass over the whole document
+_PROMPT_HEAD_TEMPLATE, _PROMPT_TAIL = _PROMPT_TEMPLATE.split("{text}", 1)
+_PROMPT_TAIL = _PROMPT_TAIL.format()
+
+# Fully-rendered prompt prefix per template, keyed by identity like the
+# other per-template caches
+_STANDARD_PROMPT_PREFIX = _PROMPT_HEAD_TEMPLATE.format(
+    template_keys_json=_STANDARD_TEMPLATE_KEYS_JSON
+)
+_PROMPT_PREFIX_CACHE: Dict[int, str] = {}
+
+
+def _prompt_prefix(template: Dict[str, Any]) -> str:
+    """Return the rendered prompt text that precedes the document."""
+    if template is STANDARD_TEMPLATE:
+        return _STANDARD_PROMPT_PREFIX
+
+    cached = _PROMPT_PREFIX_CACHE.get(id(template))
+    if cached is None:
+        cached = _PROMPT_HEAD_TEMPLATE.format(
+            template_keys_json=_template_keys_json(template)
+        )
+        _PROMPT_PREFIX_CACHE[id(template)] = cached
+    return cached
+
+
+def _build_extraction_prompt(text: str, template: Dict[str, Any]) -> str:
+    """
+    Build prompt for LLM extraction.
+
+    NOTE: We only extract VALUES, not word_indexes.
+    Word index mapping is done backend-side using exact string matching.
+    This ensures precise word-level highlighting without relying on LLM positional guesses.
+    """
+    return _prompt_prefix(template) + text + _PROMPT_TAIL
+
+
 def _parse_llm_response(response_text: str, template: Dict[str, Any]) -> Dict[str, Any]:
     """
     Parse LLM JSON response safely.
@@ -214,20 +628,11 @@ def _parse_llm_response(response_text: str, template: Dict[str, Any]) -> Dict[st
     NOTE: We only expect value and word_indexes, not start/end.
     Positional metadata is no longer extracted from Groq.
     """
-    cleaned = response_text.strip()
-
-    # Remove markdown code blocks if present
-    if cleaned.startswith("```"):
-        parts = cleaned.split("```")
-        for part in parts:
-            part = part.strip()
-            if part and part not in {"json", "JSON"}:
-                cleaned = part
-                break
+    cleaned = _strip_code_fences(response_text.strip())
 
     try:
-        parsed = json.loads(cleaned)
-    except json.JSONDecodeError as exc:
+        parsed = orjson.loads(cleaned)
+    except orjson.JSONDecodeError as exc:
         logger.error(f"Failed to parse LLM response as JSON: {exc}")
         logger.debug(f"Response text: {response_text[:500]}")
         return _create_empty_fields(template)
@@ -236,152 +641,315 @@ def _parse_llm_response(response_text: str, template: Dict[str, Any]) -> Dict[st
         logger.error(f"LLM response is not a dictionary: {type(parsed)}")
         return _create_empty_fields(template)
 
-    # Validate and normalize response
-    result = {}
-    template_keys = set(template.keys())
+    return _validate_llm_fields(parsed, template)
 
-    for field_key, field_data in parsed.items():
-        # Only include fields that are in the template
-        if field_key not in template_keys:
-            logger.warning(f"Ignoring field not in template: {field_key}")
-            continue
 
-        if not isinstance(field_data, dict):
-            logger.warning(f"Invalid field data format for {field_key}: {type(field_data)}")
-            result[field_key] = {"value": None}
-            continue
+# Hex line-number prefix ("0x1a2b: ") that add_line_nos injects into text
+_HEX_LINE_NO_RE = re.compile(r'0x[0-9A-Fa-f]+:\s*')
 
-        # Extract value only (word_indexes determined backend-side)
-        result[field_key] = {
-            "value": field_data.get("value"),
-        }
+# Deletes ASCII punctuation in one C-level pass; see _strip_punctuation
+_PUNCT_DELETE_TABLE = str.maketrans("", "", string.punctuation)
+
+# Markdown code fence around an LLM response, with an optional json tag
+_FENCE_RE = re.compile(r"^\s*```(?:json|JSON)?\s*\n?(.*?)\n?```\s*$", re.DOTALL)
+
+
+def _strip_code_fences(cleaned: str) -> str:
+    """Remove surrounding markdown code fences from an LLM response."""
+    match = _FENCE_RE.match(cleaned)
+    if match:
+        return match.group(1)
+    return cleaned
 
-    # Ensure all template fields are present
-    for key in template_keys:
-        if key not in result:
-            result[key] = {"value": None}
+
+def _validate_llm_fields(parsed: Dict[str, Any], template: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and normalize one parsed response object against the template."""
+    template_keys, template_keyset = _template_meta(template)
+
+    # One pass over the template keys probes the parsed dict directly;
+    # missing and malformed entries collapse to value=None in the same step
+    result = {}
+    for field_key in template_keys:
+        field_data = parsed.get(field_key)
+        if isinstance(field_data, dict):
+            # Extract value only (word_indexes determined backend-side)
+            result[field_key] = {_K_VALUE: field_data.get(_K_VALUE)}
+        else:
+            if field_data is not None:
+                logger.warning(f"Invalid field data format for {field_key}: {type(field_data)}")
+            result[field_key] = {_K_VALUE: None}
+
+    if len(parsed) > len(result):
+        extras = [key for key in parsed if key not in template_keyset]
+        if extras:
+            logger.warning(f"Ignoring fields not in template: {extras}")
 
     return result
 
 
-def _find_word_indexes_for_value_from_words(
-    value: str, words_list: List[str], bounding_boxes: Dict[str, Any]
-) -> List[int]:
+class _WordMatchIndex:
+    """
+    Per-document lookup structure for value-to-word matching.
+
+    Built once per extraction, it records the candidate start positions of
+    every word (exact and lowercased) so each field lookup jumps straight to
+    plausible windows instead of scanning every window of the document.
+    """
+
+    __slots__ = (
+        "words",
+        "words_lower",
+        "words_clean",
+        "blob_lower",
+        "blob_clean",
+        "clean_offsets",
+        "word_objs",
+        "positions",
+        "positions_lower",
+        "words_digits",
+    )
+
+    def __init__(self, words_list: List[str], bounding_boxes: Dict[str, Any]) -> None:
+        self.words = [w.strip() for w in words_list]
+        # Normalized views are computed once here; the matcher never
+        # re-lowers or re-cleans a document word per field lookup
+        self.words_lower = [w.lower() for w in self.words]
+        self.words_clean = [_strip_punctuation(w) for w in self.words_lower]
+        # Space-joined lowered text: one C-level substring test can reject
+        # a phrase before any per-window comparison runs
+        self.blob_lower = " ".join(self.words_lower)
+        # Cleaned blob plus per-word start offsets: the punctuation-
+        # normalized fallback becomes str.find plus a bisect instead of a
+        # window scan over every position
+        offsets = []
+        pos = 0
+        for word in self.words_clean:
+            offsets.append(pos)
+            pos += len(word) + 1
+        self.clean_offsets = offsets
+        self.blob_clean = " ".join(self.words_clean)
+
+        word_objs: List[Any] = []
+        if isinstance(bounding_boxes, dict):
+            words = bounding_boxes.get("words")
+            if isinstance(words, list):
+                word_objs = words
+        self.word_objs = word_objs
+
+        positions: Dict[str, List[int]] = {}
+        positions_lower: Dict[str, List[int]] = {}
+        for i, word in enumerate(self.words):
+            positions.setdefault(word, []).append(i)
+            positions_lower.setdefault(self.words_lower[i], []).append(i)
+        self.positions = positions
+        self.positions_lower = positions_lower
+
+        # Digits-only view per word, built lazily by _find_digit_window;
+        # most documents never reach the digit-normalized fallback
+        self.words_digits = None
+
+
+def _strip_punctuation(word: str) -> str:
+    """Drop punctuation from a word for fuzzy comparison."""
+    if word.isascii():
+        return word.translate(_PUNCT_DELETE_TABLE)
+    # Non-ASCII words keep the per-character filter so unicode symbols are
+    # still stripped the same way as before
+    return ''.join(c for c in word if c.isalnum() or c.isspace())
+
+
+def _indexes_for_window(match_index: _WordMatchIndex, start: int, count: int) -> List[int]:
+    """Resolve a matched window to real word indexes (or sequential fallback)."""
+    word_objs = match_index.word_objs
+    if word_objs and start < len(word_objs):
+        window = word_objs[start:start + count]
+        try:
+            # Well-formed payloads have an index on every word; take that
+            # path without per-word type checks
+            indexes = [int(word_obj["index"]) for word_obj in window]
+        except (KeyError, TypeError):
+            indexes = [
+                int(word_obj["index"])
+                for word_obj in window
+                if isinstance(word_obj, dict) and word_obj.get("index") is not None
+            ]
+        if indexes:
+            return sorted(set(indexes))
+    return list(range(start, start + count))
+
+
+def _find_word_indexes(value: str, match_index: _WordMatchIndex) -> List[int]:
     """
     Find word indexes for a field value using exact string matching.
-    
-    Uses bounding_boxes.words if available (more reliable), otherwise uses words_list.
-    Handles multi-word values by finding consecutive word matches.
-    
-    Args:
-        value: The field value to find
-        words_list: List of word texts (from bounding_boxes.words or tokenized text)
-        bounding_boxes: Bounding box data (to get word indexes from words array)
-        
+
+    Tries exact case-sensitive matches first (jumping via the index), then
+    case-insensitive candidates, then a punctuation-normalized scan as the
+    last resort (punctuation differences in the first word defeat the jump).
+
     Returns:
         List of word indexes (0-based) where the value appears
     """
-    if not value or not words_list:
+    if not value or not match_index.words:
         return []
-    
-    # Normalize value: strip whitespace, handle case-insensitive matching
-    value_normalized = value.strip()
-    value_words = value_normalized.split()
-    
+
+    # Space-free values are almost always a single token; probe the
+    # position tables before paying for the split. A miss falls through
+    # to the general path, which still handles tab/newline separators
+    # and punctuation normalization.
+    if " " not in value and len(value) <= 40:
+        starts = match_index.positions.get(value)
+        if starts:
+            return _indexes_for_window(match_index, starts[0], 1)
+        starts = match_index.positions_lower.get(value.lower())
+        if starts:
+            logger.warning(f"Fuzzy-match used for value '{value}' (case-insensitive)")
+            return _indexes_for_window(match_index, starts[0], 1)
+
+    value_words = value.split()
     if not value_words:
         return []
-    
-    # Normalize words_list (trim whitespace, preserve case for exact match)
-    normalized_words = [w.strip() for w in words_list]
-    
-    # Try exact match first (case-sensitive, then case-insensitive)
-    word_indexes = []
-    
-    # First pass: exact case-sensitive match
-    for i in range(len(normalized_words) - len(value_words) + 1):
-        match = True
-        for j, value_word in enumerate(value_words):
-            if i + j >= len(normalized_words):
-                match = False
-                break
-            if normalized_words[i + j] != value_word:
-                match = False
-                break
-        
-        if match:
-            # Found exact match - use indexes from bounding_boxes.words if available
-            if isinstance(bounding_boxes, dict):
-                words = bounding_boxes.get("words") or []
-                if isinstance(words, list) and i < len(words):
-                    # Get actual word indexes from bounding_boxes.words
-                    indexes = []
-                    for j in range(len(value_words)):
-                        if i + j < len(words):
-                            word_obj = words[i + j]
-                            if isinstance(word_obj, dict):
-                                word_idx = word_obj.get("index")
-                                if word_idx is not None:
-                                    indexes.append(int(word_idx))
-                    if indexes:
-                        return sorted(list(set(indexes)))
-            
-            # Fallback: use sequential indexes
-            word_indexes.extend(range(i, i + len(value_words)))
-            break
-    
-    # Second pass: case-insensitive match if exact match failed
-    if not word_indexes:
-        value_words_lower = [w.lower() for w in value_words]
-        normalized_words_lower = [w.lower() for w in normalized_words]
-        
-        for i in range(len(normalized_words_lower) - len(value_words_lower) + 1):
-            match = True
-            for j, value_word_lower in enumerate(value_words_lower):
-                if i + j >= len(normalized_words_lower):
-                    match = False
-                    break
-                # Remove punctuation for comparison
-                token_word = ''.join(c for c in normalized_words_lower[i + j] if c.isalnum() or c.isspace())
-                value_word_clean = ''.join(c for c in value_word_lower if c.isalnum() or c.isspace())
-                if token_word != value_word_clean:
-                    match = False
-                    break
-            
-            if match:
-                # Found fuzzy match - log warning
+
+    words = match_index.words
+    count = len(value_words)
+    if count > len(words):
+        return []
+
+    # Single-word values resolve with one dict probe per pass; the
+    # positions tables already guarantee the word matches at each start
+    if count == 1:
+        starts = match_index.positions.get(value_words[0])
+        if starts:
+            return _indexes_for_window(match_index, starts[0], 1)
+        starts = match_index.positions_lower.get(value_words[0].lower())
+        if starts:
+            logger.warning(f"Fuzzy-match used for value '{value}' (case-insensitive)")
+            return _indexes_for_window(match_index, starts[0], 1)
+
+    # First pass: exact case-sensitive match at candidate starts only
+    for start in match_index.positions.get(value_words[0], ()):
+        if start + count > len(words):
+            continue
+        if words[start:start + count] == value_words:
+            return _indexes_for_window(match_index, start, count)
+
+    # Second pass: case-insensitive match at lowercased candidate starts.
+    # A phrase absent from the joined lowered text cannot match any window,
+    # so one substring test skips the candidate walk entirely.
+    words_lower = match_index.words_lower
+    value_words_lower = [w.lower() for w in value_words]
+    phrase_lower = " ".join(value_words_lower)
+    if len(phrase_lower) <= len(match_index.blob_lower) and phrase_lower in match_index.blob_lower:
+        candidate_starts = match_index.positions_lower.get(value_words_lower[0], ())
+    else:
+        candidate_starts = ()
+    for start in candidate_starts:
+        if start + count > len(words):
+            continue
+        if words_lower[start:start + count] == value_words_lower:
+            logger.warning(f"Fuzzy-match used for value '{value}' (case-insensitive)")
+            return _indexes_for_window(match_index, start, count)
+
+    # Last resort: punctuation-normalized search over the cleaned blob.
+    # A word-boundary-aligned hit is mapped back to word positions via the
+    # offset table, so the whole fallback is one find plus two bisects.
+    phrase_clean = " ".join(_strip_punctuation(w) for w in value_words_lower).strip()
+    if phrase_clean and len(phrase_clean) <= len(match_index.blob_clean):
+        blob = match_index.blob_clean
+        offsets = match_index.clean_offsets
+        pos = blob.find(phrase_clean)
+        while pos != -1:
+            end = pos + len(phrase_clean)
+            if (pos == 0 or blob[pos - 1] == " ") and (end == len(blob) or blob[end] == " "):
                 logger.warning(f"Fuzzy-match used for value '{value}' (case-insensitive/punctuation-normalized)")
-                
-                # Use indexes from bounding_boxes.words if available
-                if isinstance(bounding_boxes, dict):
-                    words = bounding_boxes.get("words") or []
-                    if isinstance(words, list) and i < len(words):
-                        indexes = []
-                        for j in range(len(value_words)):
-                            if i + j < len(words):
-                                word_obj = words[i + j]
-                                if isinstance(word_obj, dict):
-                                    word_idx = word_obj.get("index")
-                                    if word_idx is not None:
-                                        indexes.append(int(word_idx))
-                        if indexes:
-                            return sorted(list(set(indexes)))
-                
-                # Fallback: use sequential indexes
-                word_indexes.extend(range(i, i + len(value_words)))
+                first = bisect_right(offsets, pos) - 1
+                last = bisect_right(offsets, end - 1) - 1
+                return _indexes_for_window(match_index, first, last - first + 1)
+            pos = blob.find(phrase_clean, pos + 1)
+
+    # Numeric/date values often differ from the document only in grouping
+    # ("+91 98765 43210" vs "9876543210"); as the very last resort,
+    # compare digit sequences across consecutive words. Only values made
+    # of digits and separators qualify — for mixed text like
+    # "Corp. Date 2024" a digits-only comparison would latch onto an
+    # unrelated number elsewhere in the document.
+    if _DIGIT_VALUE_RE.match(value):
+        value_digits = "".join(c for c in value if c.isdigit())
+        if len(value_digits) >= _MIN_DIGIT_MATCH_LEN:
+            window = _find_digit_window(value_digits, match_index)
+            if window is not None:
+                logger.warning(f"Fuzzy-match used for value '{value}' (digit-normalized)")
+                start, count = window
+                return _indexes_for_window(match_index, start, count)
+
+    return []
+
+
+# Digit-normalized matching only engages for values with at least this
+# many digits; shorter digit runs would match far too loosely
+_MIN_DIGIT_MATCH_LEN = 4
+
+# A value qualifies for digit-normalized matching only when everything
+# besides its digits is grouping punctuation (phone/date separators)
+_DIGIT_VALUE_RE = re.compile(r"^[0-9\s+\-/().,:]+$")
+
+
+def _find_digit_window(value_digits: str, match_index: _WordMatchIndex) -> Tuple[int, int] | None:
+    """Find a word window whose concatenated digits equal value_digits.
+
+    Returns (start, count) for the first such window, or None. The window
+    must consume each word's digits exactly, so partial-word overlaps
+    never match.
+    """
+    words_digits = match_index.words_digits
+    if words_digits is None:
+        words_digits = ["".join(c for c in w if c.isdigit()) for w in match_index.words]
+        match_index.words_digits = words_digits
+
+    target_len = len(value_digits)
+    n = len(words_digits)
+    for start in range(n):
+        word_digits = words_digits[start]
+        if not word_digits or not value_digits.startswith(word_digits):
+            continue
+        pos = len(word_digits)
+        end = start
+        while pos < target_len and end + 1 < n:
+            end += 1
+            next_digits = words_digits[end]
+            if not next_digits or value_digits[pos:pos + len(next_digits)] != next_digits:
+                pos = -1
                 break
-    
-    # Remove duplicates and sort
-    return sorted(list(set(word_indexes)))
+            pos += len(next_digits)
+        if pos == target_len:
+            return start, end - start + 1
+    return None
+
+
+def _find_word_indexes_for_value_from_words(
+    value: str, words_list: List[str], bounding_boxes: Dict[str, Any]
+) -> List[int]:
+    """
+    Compatibility wrapper that builds a one-shot index for a single lookup.
+
+    Callers mapping many fields against the same document should build a
+    _WordMatchIndex once and use _find_word_indexes directly.
+    """
+    return _find_word_indexes(value, _WordMatchIndex(words_list, bounding_boxes))
 
 
 def _create_empty_fields(template: Dict[str, Any]) -> Dict[str, Any]:
-    """Create empty field entries for all template keys."""
+    """Create empty field entries for all template keys.
+
+    Iterates the cached per-template key list; the inner dicts (and their
+    lists) must be fresh per call since callers mutate the result.
+    """
+    keys, _ = _template_meta(template)
     return {
         key: {
-            "value": "",
-            "word_indexes": [],
+            _K_VALUE: "",
+            _K_WORD_INDEXES: [],
         }
-        for key in template.keys()
+        for key in keys
     }
 
 
@@ -503,46 +1071,69 @@ def merge_word_bounding_boxes(
 
     index_lookup = _build_index_lookup(bounding_box_payload)
 
-    unique_indexes: List[int] = []
-    seen = set()
-    for idx in word_indexes:
-        if idx in seen:
-            continue
-        seen.add(idx)
-        unique_indexes.append(int(idx))
+    # dict.fromkeys dedupes while preserving first-seen order in C
+    unique_indexes: List[int] = list(dict.fromkeys(int(idx) for idx in word_indexes))
 
     if not unique_indexes:
         raise ValueError("wordIndexes produced no unique indexes to map.")
 
-    selected_boxes: Dict[int, List[Dict[str, float]]] = defaultdict(list)
-
+    boxes: List[_BoxTuple] = []
     for idx in unique_indexes:
         box = index_lookup.get(idx)
-        if not box:
+        if box is None:
             raise ValueError(f"No bounding box found for word index {idx}.")
-        selected_boxes[int(box["page"])].append(box)
+        boxes.append(box)
+
+    # One global sort by (page, y, x) replaces the per-page grouping dict
+    # plus a separate sort inside every page; groupby then hands each
+    # page's boxes over in already-merged-ready order
+    boxes.sort(key=itemgetter(0, 2, 1))
 
     merged_results: List[Dict[str, float]] = []
-    for page, boxes in selected_boxes.items():
-        merged_results.extend(_merge_boxes_for_page(page, boxes))
+    for page, page_boxes in groupby(boxes, key=itemgetter(0)):
+        merged_results.extend(_merge_boxes_sorted(int(page), page_boxes))
 
     return merged_results
 
 
-def _build_index_lookup(payload: Dict[str, Any]) -> Dict[int, Dict[str, float]]:
-    """Build lookup dictionary for word indexes to bounding boxes."""
-    lookup: Dict[int, Dict[str, float]] = {}
+# Flat (page, x, y, width, height) record; a plain tuple per word instead
+# of a five-key dict keeps the lookup compact on large documents
+_BoxTuple = Tuple[float, float, float, float, float]
+
 
+def _iter_words(payload: Dict[str, Any]):
+    """Yield (word, default_page, coords) across both payload shapes."""
     words = payload.get("words")
     if isinstance(words, list):
+        coords = _detect_coord_extractor(words)
         for word in words:
-            _add_word_to_lookup(lookup, word)
+            yield word, None, coords
 
     pages = payload.get("pages")
     if isinstance(pages, list):
         for page in pages:
-            for word in page.get("words", []):
-                _add_word_to_lookup(lookup, word, default_page=page.get("page", page.get("index")))
+            page_words = page.get("words", [])
+            coords = _detect_coord_extractor(page_words)
+            default_page = page.get("page", page.get("index"))
+            for word in page_words:
+                yield word, default_page, coords
+
+
+def _build_index_lookup(payload: Dict[str, Any]) -> Dict[int, _BoxTuple]:
+    """Build lookup dictionary from word indexes to flat box tuples."""
+    lookup: Dict[int, _BoxTuple] = {}
+
+    for word, default_page, coords in _iter_words(payload):
+        # EAFP fast path: well-formed words (the overwhelming case) go
+        # straight to key access; anything malformed or relying on the
+        # page default drops to the checked helper
+        try:
+            lookup[int(word["index"])] = (
+                float(word["page"]),
+                *_box_dims(coords(word["bbox"])),
+            )
+        except (KeyError, TypeError):
+            _add_word_to_lookup(lookup, word, default_page=default_page, coords=coords)
 
     if not lookup:
         raise ValueError("Bounding box payload does not contain recognisable word data.")
@@ -550,12 +1141,52 @@ def _build_index_lookup(payload: Dict[str, Any]) -> Dict[int, Dict[str, float]]:
     return lookup
 
 
+def _box_dims(corners: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
+    """Convert (x1, y1, x2, y2) corners to (x, y, width, height)."""
+    x1, y1, x2, y2 = corners
+    return x1, y1, x2 - x1, y2 - y1
+
+
+def _xywh_coords(bbox: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    x1 = float(bbox["x"])
+    y1 = float(bbox["y"])
+    return x1, y1, x1 + float(bbox["width"]), y1 + float(bbox["height"])
+
+
+def _ltrb_coords(bbox: Dict[str, Any]) -> Tuple[float, float, float, float]:
+    return float(bbox["left"]), float(bbox["top"]), float(bbox["right"]), float(bbox["bottom"])
+
+
+def _detect_coord_extractor(words: List[Any]):
+    """
+    Pick the coordinate extractor by sniffing the first usable bbox.
+
+    A payload uses one coordinate convention throughout, so the per-word
+    format dispatch collapses to direct key access; _add_word_to_lookup
+    still falls back to the general path if a stray box disagrees.
+    """
+    for word in words:
+        if isinstance(word, dict):
+            bbox = word.get("bbox") or word.get("bounding_box")
+            if isinstance(bbox, dict) and bbox:
+                if "x" in bbox:
+                    return _xywh_coords
+                if "left" in bbox:
+                    return _ltrb_coords
+                break
+    return _normalise_box_coordinates
+
+
 def _add_word_to_lookup(
-    lookup: Dict[int, Dict[str, float]],
+    lookup: Dict[int, _BoxTuple],
     word_payload: Dict[str, Any],
     default_page: Any = None,
+    coords=None,
 ) -> None:
     """Add a word to the lookup dictionary."""
+    if coords is None:
+        coords = _normalise_box_coordinates
+
     if not isinstance(word_payload, dict):
         return
 
@@ -563,87 +1194,72 @@ def _add_word_to_lookup(
     if index is None:
         return
 
-    bbox = word_payload.get("bbox") or word_payload.get("bounding_box") or {}
+    # "bbox" is the shape every current producer emits; only probe the
+    # legacy "bounding_box" spelling when it is absent
+    bbox = word_payload.get("bbox")
     if not bbox:
-        return
+        bbox = word_payload.get("bounding_box")
+        if not bbox:
+            return
 
     page = word_payload.get("page", default_page)
     if page is None:
         return
 
-    x1, y1, x2, y2 = _normalise_box_coordinates(bbox)
-    lookup[int(index)] = {
-        "page": float(page),
-        "x": x1,
-        "y": y1,
-        "width": x2 - x1,
-        "height": y2 - y1,
-    }
+    try:
+        x1, y1, x2, y2 = coords(bbox)
+    except KeyError:
+        x1, y1, x2, y2 = _normalise_box_coordinates(bbox)
+    lookup[int(index)] = (float(page), x1, y1, x2 - x1, y2 - y1)
 
 
 def _normalise_box_coordinates(bbox: Dict[str, Any]) -> Tuple[float, float, float, float]:
     """Normalize bounding box coordinates to x1, y1, x2, y2 format."""
-    if {"x", "y", "width", "height"}.issubset(bbox):
-        x1 = float(bbox["x"])
-        y1 = float(bbox["y"])
-        return x1, y1, x1 + float(bbox["width"]), y1 + float(bbox["height"])
-
-    if {"left", "top", "right", "bottom"}.issubset(bbox):
-        return (
-            float(bbox["left"]),
-            float(bbox["top"]),
-            float(bbox["right"]),
-            float(bbox["bottom"]),
-        )
+    # Probe the leading key only instead of building a set per call; a
+    # partial box still reports the same ValueError via the KeyError path
+    try:
+        if "x" in bbox:
+            x1 = float(bbox["x"])
+            y1 = float(bbox["y"])
+            return x1, y1, x1 + float(bbox["width"]), y1 + float(bbox["height"])
+
+        if "left" in bbox:
+            return (
+                float(bbox["left"]),
+                float(bbox["top"]),
+                float(bbox["right"]),
+                float(bbox["bottom"]),
+            )
+    except KeyError as exc:
+        raise ValueError("Unsupported bounding box coordinate format.") from exc
 
     raise ValueError("Unsupported bounding box coordinate format.")
 
 
-def _merge_boxes_for_page(page: int, boxes: List[Dict[str, float]]) -> List[Dict[str, float]]:
-    """Merge bounding boxes for a single page."""
-    if not boxes:
-        return []
-
-    sorted_boxes = sorted(boxes, key=lambda b: (b["y"], b["x"]))
-    merged: List[Dict[str, float]] = []
-
-    for box in sorted_boxes:
-        if not merged:
-            merged.append({**box, "page": page})
-            continue
-
-        last = merged[-1]
-        if _boxes_should_merge(last, box):
-            merged[-1] = _merge_two_boxes(last, box)
-        else:
-            merged.append({**box, "page": page})
-
-    return merged
-
-
-def _boxes_should_merge(first: Dict[str, float], second: Dict[str, float]) -> bool:
-    """Check if two boxes should be merged."""
-    same_page = int(first["page"]) == int(second["page"])
-    if not same_page:
-        return False
-
-    vertical_overlap = abs(first["y"] - second["y"]) <= max(first["height"], second["height"]) * LINE_ALIGNMENT_RATIO
-    horizontal_gap = second["x"] - (first["x"] + first["width"])
-
-    return vertical_overlap and horizontal_gap <= max(first["width"], second["width"]) * MERGE_GAP_RATIO
-
-
-def _merge_two_boxes(first: Dict[str, float], second: Dict[str, float]) -> Dict[str, float]:
-    """Merge two bounding boxes into one."""
-    x1 = min(first["x"], second["x"])
-    y1 = min(first["y"], second["y"])
-    x2 = max(first["x"] + first["width"], second["x"] + second["width"])
-    y2 = max(first["y"] + first["height"], second["y"] + second["height"])
-
-    return {
-        "page": first["page"],
-        "x": x1,
-        "y": y1,
-        "width": x2 - x1,
-        "height": y2 - y1,
-    }
+def _merge_boxes_sorted(page: int, boxes: Iterable[_BoxTuple]) -> List[Dict[str, float]]:
+    """Merge one page's bounding boxes, already sorted by (y, x)."""
+    # Accumulate mutable [x1, y1, x2, y2] rows; merges update the current
+    # row in place instead of allocating a merged dict per step
+    rows: List[List[float]] = []
+    for _, x, y, width, height in boxes:
+        if rows:
+            row = rows[-1]
+            x1, y1, x2, y2 = row
+            vertical_overlap = abs(y1 - y) <= max(y2 - y1, height) * LINE_ALIGNMENT_RATIO
+            horizontal_gap = x - x2
+            if vertical_overlap and horizontal_gap <= max(x2 - x1, width) * MERGE_GAP_RATIO:
+                if x < x1:
+                    row[0] = x
+                if y < y1:
+                    row[1] = y
+                if x + width > x2:
+                    row[2] = x + width
+                if y + height > y2:
+                    row[3] = y + height
+                continue
+        rows.append([x, y, x + width, y + height])
+
+    return [
+        {"page": page, "x": x1, "y": y1, "width": x2 - x1, "height": y2 - y1}
+        for x1, y1, x2, y2 in rows
+    ]
@@ -1,9 +1,15 @@
 import json
 import logging
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json serialization
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Base paths for input and output folders
@@ -11,6 +17,10 @@ BASE_DIR = Path(__file__).parent.parent
 INPUT_DIR = BASE_DIR / "input_files"
 OUTPUT_DIR = BASE_DIR / "output_files"
 
+# Compiled once; sanitize_filename runs for every saved artifact
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\-_]')
+_REPEAT_UNDERSCORE_RE = re.compile(r'_+')
+
 
 def ensure_folders() -> None:
     """Create input_files/ and output_files/ directories if they don't exist."""
@@ -18,9 +28,13 @@ def ensure_folders() -> None:
     OUTPUT_DIR.mkdir(exist_ok=True)
 
 
+@lru_cache(maxsize=1024)
 def sanitize_filename(filename: str) -> str:
     """
     Sanitize filename by removing extension and replacing unsafe characters.
+
+    Memoized: a single request sanitizes the same name four times (input
+    copy plus three output paths), and re-uploads repeat it again.
     
     Args:
         filename: Original filename
@@ -32,10 +46,10 @@ def sanitize_filename(filename: str) -> str:
     name = Path(filename).stem
     
     # Replace spaces and unsafe characters with underscores
-    name = re.sub(r'[^\w\-_]', '_', name)
-    
+    name = _UNSAFE_CHARS_RE.sub('_', name)
+
     # Remove multiple consecutive underscores
-    name = re.sub(r'_+', '_', name)
+    name = _REPEAT_UNDERSCORE_RE.sub('_', name)
     
     # Remove leading/trailing underscores
     name = name.strip('_')
@@ -57,8 +71,7 @@ def save_bytes(path: Path, bytes_data: bytes) -> None:
     try:
         ensure_folders()
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "wb") as f:
-            f.write(bytes_data)
+        path.write_bytes(bytes_data)
         logger.info("Saved input file to %s", path)
     except Exception as e:
         logger.error("Failed to save bytes to %s: %s", path, e)
@@ -76,8 +89,11 @@ def save_json(path: Path, data: Any) -> None:
     try:
         ensure_folders()
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         logger.info("Saved JSON data to %s", path)
     except Exception as e:
         logger.error("Failed to save JSON to %s: %s", path, e)
@@ -127,8 +143,7 @@ def save_text(path: Path, text: str) -> None:
     try:
         ensure_folders()
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(text)
+        path.write_text(text, encoding="utf-8")
         logger.info("Saved text file to %s", path)
     except Exception as e:
         logger.error("Failed to save text to %s: %s", path, e)
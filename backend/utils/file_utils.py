@@ -1,17 +1,22 @@
 import os
-from typing import Set
+from typing import FrozenSet
 
 from fastapi import HTTPException, UploadFile, status
 
 
-ALLOWED_EXTENSIONS: Set[str] = {".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".docx", ".xlsx"}
+ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset(
+    {".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".docx", ".xlsx"}
+)
+
+# Rendered once; only needed when a validation fails, but the set never
+# changes so there is no reason to sort and join it per rejection
+_ALLOWED_DISPLAY = ", ".join(sorted(ALLOWED_EXTENSIONS))
 
 
 def validate_file_extension(upload_file: UploadFile) -> None:
     _, extension = os.path.splitext(upload_file.filename or "")
     if extension.lower() not in ALLOWED_EXTENSIONS:
-        allowed_display = ", ".join(sorted(ALLOWED_EXTENSIONS))
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type '{extension}'. Allowed types: {allowed_display}",
+            detail=f"Unsupported file type '{extension}'. Allowed types: {_ALLOWED_DISPLAY}",
         )